@@ -1,62 +1,122 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import ttk
 import ast
-import operator
-
-# Evaluator aman menggunakan AST
-ALLOWED_OPERATORS = {
-    ast.Add: operator.add,
-    ast.Sub: operator.sub,
-    ast.Mult: operator.mul,
-    ast.Div: operator.truediv,
-    ast.Mod: operator.mod,
-    ast.Pow: operator.pow,
-    ast.USub: operator.neg,
-    ast.UAdd: operator.pos,
-    ast.FloorDiv: operator.floordiv,
+import functools
+import re
+from functools import partial
+
+# Evaluator aman menggunakan AST. Aritmetika dijalankan oleh bytecode hasil
+# compile, jadi validasi hanya butuh himpunan tipe operator yang diizinkan.
+_ALLOWED_BINOPS = frozenset({
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow, ast.FloorDiv,
+})
+_ALLOWED_UNARYOPS = frozenset({ast.USub, ast.UAdd})
+
+# Batas eksponen agar pangkat tidak mengunci GUI (mis. 9^9^9^9)
+_MAX_POW_EXP = 1000
+
+# Batas panjang teks tampilan
+_MAX_DISPLAY = 30
+
+
+def _v_expr(node, stack):
+    stack.append(node.body)
+
+
+def _v_const(node, stack):
+    if not isinstance(node.value, (int, float)):
+        raise ValueError('Tipe konstanta tidak diizinkan')
+
+
+def _v_binop(node, stack):
+    if type(node.op) not in _ALLOWED_BINOPS:
+        raise ValueError('Operator tidak diizinkan')
+    if isinstance(node.op, ast.Pow):
+        # tolak rantai pangkat dan eksponen konstanta yang terlalu besar
+        if (isinstance(node.left, ast.BinOp) and isinstance(node.left.op, ast.Pow)) or \
+           (isinstance(node.right, ast.BinOp) and isinstance(node.right.op, ast.Pow)):
+            raise ValueError('Pangkat bersarang tidak diizinkan')
+        if isinstance(node.right, ast.Constant) and \
+           isinstance(node.right.value, int) and node.right.value > _MAX_POW_EXP:
+            raise ValueError('Eksponen terlalu besar')
+    stack.append(node.left)
+    stack.append(node.right)
+
+
+def _v_unaryop(node, stack):
+    if type(node.op) not in _ALLOWED_UNARYOPS:
+        raise ValueError('Operator unary tidak diizinkan')
+    stack.append(node.operand)
+
+
+# Validator per tipe node: satu lookup dict, tanpa rantai isinstance.
+# Anak node didorong ke stack eksplisit, bukan lewat rekursi.
+_VALIDATORS = {
+    ast.Expression: _v_expr,
+    ast.Constant: _v_const,
+    ast.BinOp: _v_binop,
+    ast.UnaryOp: _v_unaryop,
 }
 
 
+def _validate(tree):
+    # Tolak semua node di luar himpunan aritmetika yang diizinkan
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        try:
+            validator = _VALIDATORS[type(node)]
+        except KeyError:
+            raise ValueError('Ekspresi tidak diizinkan') from None
+        validator(node, stack)
+
+
+# Tabel translasi simbol kalkulator -> operator Python (satu pass C-level)
+_CALC_TRANS = str.maketrans({'×': '*', '÷': '/'})
+
+# Token angka di ujung ekspresi (untuk negate/percent)
+_TAIL_NUM_RE = re.compile(r'[0-9eE.]+$')
+
+# Ekspresi yang sudah berupa satu literal angka (hasil '=' sebelumnya).
+# Tanpa nol di depan: '007' bukan hasil dan harus tetap jatuh ke safe_eval
+# (SyntaxError -> 'Error') seperti semula
+_NUM_ONLY_RE = re.compile(r'^-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$')
+
+
+@functools.lru_cache(maxsize=64)
+def _normalize(expr: str) -> str:
+    # Ganti simbol kalkulator umum ke operator Python
+    expr = expr.translate(_CALC_TRANS)
+    if '^' in expr:
+        expr = expr.replace('^', '**')
+    return expr
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_cached(expr: str):
+    # Parse + validasi + compile dimemoisasi: ekspresi yang sama langsung
+    # mendapat code object siap pakai
+    tree = ast.parse(expr, mode='eval')
+    _validate(tree)
+    return compile(tree, '<calc>', 'eval')
+
+
+@functools.lru_cache(maxsize=256)
 def safe_eval(expr: str):
     """Evaluasi ekspresi matematika sederhana secara aman.
     Mendukung + - * / % // dan pangkat (**). Mengizinkan angka float dan integer.
+
+    Hasil dimemoisasi per string ekspresi: aritmetikanya deterministik,
+    jadi '=' berulang pada ekspresi yang sama cukup satu lookup dict.
     """
-    # Ganti simbol kalkulator umum ke operator Python
-    expr = expr.replace('×', '*').replace('÷', '/').replace('^', '**')
+    expr = _normalize(expr)
 
     try:
-        node = ast.parse(expr, mode='eval')
+        code = _compile_cached(expr)
     except SyntaxError:
         raise ValueError('Sintaks salah')
 
-    def _eval(node):
-        if isinstance(node, ast.Expression):
-            return _eval(node.body)
-        if isinstance(node, ast.Num):  # < Py3.8
-            return node.n
-        if isinstance(node, ast.Constant):  # Py3.8+
-            if isinstance(node.value, (int, float)):
-                return node.value
-            raise ValueError('Tipe konstanta tidak diizinkan')
-        if isinstance(node, ast.BinOp):
-            op_type = type(node.op)
-            if op_type not in ALLOWED_OPERATORS:
-                raise ValueError('Operator tidak diizinkan')
-            left = _eval(node.left)
-            right = _eval(node.right)
-            return ALLOWED_OPERATORS[op_type](left, right)
-        if isinstance(node, ast.UnaryOp):
-            op_type = type(node.op)
-            if op_type not in ALLOWED_OPERATORS:
-                raise ValueError('Operator unary tidak diizinkan')
-            operand = _eval(node.operand)
-            return ALLOWED_OPERATORS[op_type](operand)
-        if isinstance(node, ast.Call):
-            raise ValueError('Pemanggilan fungsi tidak diizinkan')
-        raise ValueError('Ekspresi tidak diizinkan')
-
-    return _eval(node)
+    return eval(code, {'__builtins__': {}}, {})
 
 
 class Calculator(tk.Tk):
@@ -66,31 +126,49 @@ class Calculator(tk.Tk):
         self.resizable(False, False)
         self.configure(bg='#222')
 
-        self.expr = ''
+        # Buffer karakter: append/pop O(1), string hanya dibentuk saat dibaca
+        self._buf: list[str] = []
+        # Id flush tampilan yang tertunda (digabung per iterasi event loop)
+        self._flush_after_id = None
+        # Teks terakhir yang didorong ke tampilan, untuk melewati set() no-op
+        self._last_display = None
+        # Id timer 'Error' yang sedang berjalan (satu timer, bukan antrean)
+        self._err_after_id = None
 
         self._create_widgets()
         self._bind_keys()
 
     def _create_widgets(self):
-        style = ttk.Style(self)
-        style.theme_use('default')
-
-        # Tampilan (entry-like label)
-        self.display_var = tk.StringVar()
-        self.display = ttk.Label(self, textvariable=self.display_var, anchor='e', font=('Segoe UI', 28), background='#222', foreground='white')
+        # Widget tk polos: tanpa mesin tema ttk, konstruksi dan klik lebih ringan
+        # Tampilan (entry-like label); teks diset langsung tanpa StringVar
+        # (tanpa trace variabel Tcl per update)
+        self.display = tk.Label(self, text='0', anchor='e', font=('Segoe UI', 28), background='#222', foreground='white')
         self.display.grid(row=0, column=0, columnspan=4, sticky='nsew', padx=10, pady=(10, 0))
 
-        btn_specs = [
-            ('C', 1, 0, self.clear), ('+/-', 1, 1, self.negate), ('%', 1, 2, self.percent), ('⌫', 1, 3, self.backspace),
-            ('7', 2, 0, lambda: self.append('7')), ('8', 2, 1, lambda: self.append('8')), ('9', 2, 2, lambda: self.append('9')), ('÷', 2, 3, lambda: self.append('÷')),
-            ('4', 3, 0, lambda: self.append('4')), ('5', 3, 1, lambda: self.append('5')), ('6', 3, 2, lambda: self.append('6')), ('×', 3, 3, lambda: self.append('×')),
-            ('1', 4, 0, lambda: self.append('1')), ('2', 4, 1, lambda: self.append('2')), ('3', 4, 2, lambda: self.append('3')), ('-', 4, 3, lambda: self.append('-')),
-            ('0', 5, 0, lambda: self.append('0')), ('.', 5, 1, lambda: self.append('.')), ('=', 5, 2, self.evaluate), ('+', 5, 3, lambda: self.append('+')),
+        # Baris tombol; posisi grid diturunkan dari indeks baris/kolom
+        btn_rows = [
+            ('C', '+/-', '%', '⌫'),
+            ('7', '8', '9', '÷'),
+            ('4', '5', '6', '×'),
+            ('1', '2', '3', '-'),
+            ('0', '.', '=', '+'),
         ]
 
-        for (text, r, c, cmd) in btn_specs:
-            btn = ttk.Button(self, text=text, command=cmd)
-            btn.grid(row=r, column=c, sticky='nsew', padx=6, pady=6)
+        # Tombol non-append; sisanya memakai partial (callable level-C, lebih
+        # ringan daripada lambda per tombol)
+        special = {
+            'C': self.clear,
+            '+/-': self.negate,
+            '%': self.percent,
+            '⌫': self.backspace,
+            '=': self.evaluate,
+        }
+
+        grid_opts = {'sticky': 'nsew', 'padx': 6, 'pady': 6}
+        for r, row in enumerate(btn_rows, start=1):
+            for c, text in enumerate(row):
+                cmd = special.get(text) or partial(self.append, text)
+                tk.Button(self, text=text, command=cmd).grid(row=r, column=c, **grid_opts)
 
         # Grid weight
         for i in range(6):
@@ -120,89 +198,113 @@ class Calculator(tk.Tk):
         elif key == '\r':
             self.evaluate()
 
+    @property
+    def expr(self) -> str:
+        return ''.join(self._buf)
+
+    @expr.setter
+    def expr(self, value: str):
+        self._buf[:] = value
+
     def append(self, char: str):
         # Hindari beberapa karakter berulang yang tidak masuk akal di input
-        if char in '÷×+-' and (not self.expr or self.expr[-1] in '÷×+-'):
+        buf = self._buf
+        if char in '÷×+-' and (not buf or buf[-1] in '÷×+-'):
             # jika pengguna menekan operator berturut-turut, ganti operator terakhir
-            if self.expr:
-                self.expr = self.expr[:-1] + char
+            if buf:
+                buf[-1] = char
                 self._update_display()
                 return
             # jangan tambahkan operator saat kosong
             return
 
-        self.expr += char
+        buf.append(char)
         self._update_display()
 
     def clear(self):
-        self.expr = ''
+        self._buf.clear()
         self._update_display()
 
     def backspace(self):
-        self.expr = self.expr[:-1]
+        if self._buf:
+            self._buf.pop()
         self._update_display()
 
-    def negate(self):
-        # toggle sign pada nilai saat ini (bekerja pada angka terakhir)
-        if not self.expr:
+    def _apply_to_last_num(self, fn):
+        # cari angka terakhir dengan satu pencarian regex, lalu terapkan fn
+        m = _TAIL_NUM_RE.search(self.expr)
+        if not m:
             return
-        # coba evaluasi bagian terakhir jika mungkin
         try:
-            # cari batas angka terakhir
-            i = len(self.expr) - 1
-            while i >= 0 and (self.expr[i].isdigit() or self.expr[i] == '.' or self.expr[i] in 'eE'):
-                i -= 1
-            # bagian angka
-            num = self.expr[i+1:]
-            if not num:
-                return
-            val = float(num)
-            val = -val
+            num = m.group()
+            # jalur cepat int: tanpa bolak-balik float, tanpa artefak pembulatan
+            val = fn(float(num) if '.' in num or 'e' in num or 'E' in num else int(num))
+            if isinstance(val, float) and val.is_integer():
+                val = int(val)
             # pasang kembali
-            self.expr = self.expr[:i+1] + (str(int(val)) if val.is_integer() else str(val))
+            self.expr = self.expr[:m.start()] + str(val)
             self._update_display()
         except Exception:
             return
 
+    def negate(self):
+        # toggle sign pada nilai saat ini (bekerja pada angka terakhir)
+        self._apply_to_last_num(lambda v: -v)
+
     def percent(self):
-        # ubah angka terakhir menjadi persen (angka/100)
-        if not self.expr:
-            return
-        try:
-            i = len(self.expr) - 1
-            while i >= 0 and (self.expr[i].isdigit() or self.expr[i] == '.' or self.expr[i] in 'eE'):
-                i -= 1
-            num = self.expr[i+1:]
-            if not num:
-                return
-            val = float(num) / 100.0
-            self.expr = self.expr[:i+1] + (str(int(val)) if val.is_integer() else str(val))
-            self._update_display()
-        except Exception:
-            return
+        # ubah angka terakhir menjadi persen (angka/100); tetap int jika habis
+        # dibagi 100
+        self._apply_to_last_num(
+            lambda v: v // 100 if isinstance(v, int) and v % 100 == 0 else v / 100.0)
 
     def evaluate(self):
         if not self.expr:
             return
+        # '=' pada angka murni: tampilan sudah benar, tak perlu parse
+        if _NUM_ONLY_RE.match(self.expr):
+            return
         try:
-            # ubah simbol dan evaluasi secara aman
-            py_expr = self.expr.replace('÷', '/').replace('×', '*')
-            result = safe_eval(py_expr)
+            # safe_eval sudah menormalkan simbol
+            result = safe_eval(self.expr)
             # format hasil: jika integer tampilkan tanpa .0
             if isinstance(result, float) and result.is_integer():
                 result = int(result)
             self.expr = str(result)
             self._update_display()
-        except Exception as e:
-            self.display_var.set('Error')
-            self.after(1200, self._update_display)
+        except Exception:
+            # batalkan flush tertunda agar tidak menimpa teks 'Error' di
+            # batch event yang sama
+            if self._flush_after_id is not None:
+                self.after_cancel(self._flush_after_id)
+                self._flush_after_id = None
+            self._last_display = 'Error'
+            self.display.config(text='Error')
+            # error beruntun memakai ulang satu timer, tidak menumpuk
+            if self._err_after_id is not None:
+                self.after_cancel(self._err_after_id)
+            self._err_after_id = self.after(1200, self._clear_err)
+
+    def _clear_err(self):
+        self._err_after_id = None
+        self._update_display()
 
     def _update_display(self):
-        text = self.expr if self.expr else '0'
-        # batasi panjang tampilan
-        if len(text) > 30:
-            text = text[-30:]
-        self.display_var.set(text)
+        # Gabungkan beberapa mutasi beruntun menjadi satu redraw per iterasi
+        # event loop
+        if self._flush_after_id is None:
+            self._flush_after_id = self.after_idle(self._flush_display)
+
+    def _flush_display(self):
+        self._flush_after_id = None
+        self._do_update_display()
+
+    def _do_update_display(self):
+        # batasi panjang tampilan; slice tanpa cabang (no-op untuk teks pendek)
+        text = (self.expr or '0')[-_MAX_DISPLAY:]
+        if text == self._last_display:
+            return
+        self._last_display = text
+        self.display.config(text=text)
 
 
 if __name__ == '__main__':